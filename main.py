@@ -1,14 +1,49 @@
 import argparse
+import atexit
+import concurrent.futures
+import errno
 import os
 import shutil
 import json
 import logging
 import logging.handlers
 import getpass
+import itertools
 import socket
 import time
 import re
-from datetime import datetime, timedelta
+import sys
+import threading
+
+# 可选依赖：Linux 下使用 io_uring 批量提交重命名
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+if not sys.platform.startswith('linux'):
+    liburing = None
+
+# 可选依赖：使用 simdjson 按需解析大型配置文件
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+# 文件数超过该阈值时才启用线程池，避免小目录的线程创建开销
+PARALLEL_THRESHOLD = 16
+MAX_FILE_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+# 每次提交到 io_uring 的重命名请求数
+IO_URING_BATCH_SIZE = 256
+# 审计日志内存缓冲的记录条数
+AUDIT_BUFFER_CAPACITY = 1024
+
+# 主机名与用户名在进程内不变，导入时获取一次
+_HOST = socket.gethostname()
+_USER = getpass.getuser()
+
+# 归档子目录序号，itertools.count 的 next() 在多线程下是原子的
+_archive_counter = itertools.count()
 
 
 class AuditLogger:
@@ -18,21 +53,16 @@ class AuditLogger:
         # 创建基础Logger对象用于配置
         self._logger = logging.getLogger("FileArchiveAudit")
         self._logger.setLevel(logging.INFO)
+        # 不向根Logger传播，避免重复格式化与输出
+        self._logger.propagate = False
 
         # 防止重复添加handler
         if not self._logger.handlers:
             self._setup_audit_logging()
 
-        # 创建LoggerAdapter实例用于实际记录
-        self.logger = logging.LoggerAdapter(
-            self._logger, {
-                'host': socket.gethostname(),
-                'user': getpass.getuser(),
-                'action': 'UNKNOWN',
-                'target': 'UNKNOWN',
-                'status': 'UNKNOWN',
-                'duration_ms': 0
-            })
+        # 固定字段，每个线程复用同一个 extra 字典
+        self._base_extra = {'host': _HOST, 'user': _USER}
+        self._local = threading.local()
 
     def _setup_audit_logging(self):
         """配置审计日志存储"""
@@ -52,12 +82,23 @@ class AuditLogger:
             backupCount=30,
             encoding='utf-8')
         file_handler.setFormatter(formatter)
-        self._logger.addHandler(file_handler)
 
         # 控制台处理器（用于调试）
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        self._logger.addHandler(console_handler)
+
+        # 通过内存缓冲批量写出，减少逐条写入
+        for target in (file_handler, console_handler):
+            self._logger.addHandler(
+                logging.handlers.MemoryHandler(AUDIT_BUFFER_CAPACITY,
+                                               flushLevel=logging.ERROR,
+                                               target=target))
+        atexit.register(self.flush)
+
+    def flush(self):
+        """将缓冲的审计日志写出"""
+        for handler in self._logger.handlers:
+            handler.flush()
 
     def log(self, action, target, status, start_time=None, message=""):
         """
@@ -68,15 +109,18 @@ class AuditLogger:
         :param start_time: 操作开始时间戳
         :param message: 附加消息
         """
-        duration_ms = int(
+        extra = getattr(self._local, 'extra', None)
+        if extra is None:
+            extra = self._local.extra = dict(self._base_extra)
+        extra['action'] = action
+        extra['target'] = target
+        extra['status'] = status
+        extra['duration_ms'] = int(
             (time.time() - start_time) * 1000) if start_time else 0
-        self.logger.info(message,
-                         extra={
-                             'action': action,
-                             'target': target,
-                             'status': status,
-                             'duration_ms': duration_ms
-                         })
+        # 失败记录以 ERROR 级别输出，触发缓冲立即写出
+        level = logging.ERROR if status in ("FAILED",
+                                            "ERROR") else logging.INFO
+        self._logger.log(level, message, extra=extra)
 
 
 class ArchiveConfig:
@@ -86,8 +130,9 @@ class ArchiveConfig:
         self.args = args
         self.settings = self._load_settings()
         self.filters = self._build_filters()
-        self.log_config = self.settings.get('logging',
-                                            {}) if self.settings else {}
+        self.predicate = self._build_predicate()
+        self.audit_skips = args.audit_skips
+        self.log_config = self._section('logging')
 
     def _load_settings(self):
         """加载配置文件"""
@@ -97,18 +142,38 @@ class ArchiveConfig:
         config_path = self.args.config
         try:
             if os.path.exists(config_path):
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(config_path, 'rb') as f:
+                    data = f.read()
+                if simdjson is not None:
+                    # 惰性解析，未访问的字段不会被转换为Python对象；
+                    # 解析结果依赖解析器存活，需保留引用
+                    self._json_parser = simdjson.Parser()
+                    return self._json_parser.parse(data)
+                return json.loads(data.decode('utf-8'))
         except Exception as e:
             logging.error(f"配置文件加载错误: {str(e)}")
         return None
 
+    def _section(self, name):
+        """读取配置中的小节并转换为普通字典"""
+        if not self.settings or name not in self.settings:
+            return {}
+        section = self.settings[name]
+        return section.as_dict() if hasattr(section, 'as_dict') else section
+
+    def iter_folder_paths(self):
+        """逐个取出配置中的文件夹路径，不读取其余字段"""
+        if not self.settings or 'folders' not in self.settings:
+            return
+        for folder in self.settings['folders']:
+            if 'path' in folder:
+                yield folder['path']
+
     def _build_filters(self):
         """构建筛选条件"""
         filters = {}
 
-        if self.settings and 'default_filters' in self.settings:
-            filters.update(self.settings['default_filters'])
+        filters.update(self._section('default_filters'))
 
         if self.args.extensions:
             filters['extensions'] = [
@@ -129,12 +194,78 @@ class ArchiveConfig:
                 pattern.strip() for pattern in self.args.exclude.split(',')
             ]
 
+        # 预先计算筛选所需的不变量，避免逐文件重复解析
+        self.ext_set = frozenset(
+            ext.lower() for ext in filters.get('extensions', []))
+        self.size_limit_bytes = parse_size(
+            filters['size_limit']) if 'size_limit' in filters else None
+        self.min_size_bytes = parse_size(
+            filters['min_size']) if 'min_size' in filters else None
+        # 时间阈值以时间戳存储，可直接与 st_mtime/st_ctime 比较
+        now = time.time()
+        self.mtime_cutoff = None
+        self.ctime_cutoff = None
+        if 'modified_days' in filters:
+            self.mtime_cutoff = now - int(filters['modified_days']) * 86400
+        if 'created_days' in filters:
+            self.ctime_cutoff = now - int(filters['created_days']) * 86400
+        self.regex_re = re.compile(
+            filters['regex']) if 'regex' in filters else None
+        # 排除模式为子串匹配，合并为单个正则一次扫描完成
+        exclude = filters.get('exclude')
+        self.exclude_re = re.compile('|'.join(
+            map(re.escape, exclude))) if exclude else None
+
+        self.needs_stat = any(
+            value is not None
+            for value in (self.size_limit_bytes, self.min_size_bytes,
+                          self.mtime_cutoff, self.ctime_cutoff))
+
         return filters
 
+    def _build_predicate(self):
+        """根据当前筛选条件生成只包含有效检查的判定函数"""
+        namespace = {}
+        lines = ['def predicate(entry):', '    name = entry.name']
+
+        if 'extensions' in self.filters:
+            # 与 os.path.splitext 一致：开头的连续 "." 属于文件名而非扩展名
+            namespace['ext_set'] = self.ext_set
+            lines += [
+                "    dot = name.rfind('.')", "    if (dot <= 0 or",
+                "            (name[0] == '.' and not name[:dot].lstrip('.')) or",
+                '            name[dot:].lower() not in ext_set):',
+                '        return False'
+            ]
+        if self.exclude_re is not None:
+            namespace['exclude_search'] = self.exclude_re.search
+            lines += ['    if exclude_search(name):', '        return False']
+        if self.regex_re is not None:
+            namespace['regex_search'] = self.regex_re.search
+            lines += ['    if not regex_search(name):', '        return False']
+
+        if self.needs_stat:
+            lines.append('    st = entry.stat()')
+        stat_checks = (
+            ('size_limit', self.size_limit_bytes, 'st.st_size > size_limit'),
+            ('min_size', self.min_size_bytes, 'st.st_size < min_size'),
+            ('mtime_cutoff', self.mtime_cutoff, 'st.st_mtime > mtime_cutoff'),
+            ('ctime_cutoff', self.ctime_cutoff, 'st.st_ctime > ctime_cutoff'))
+        for name, value, condition in stat_checks:
+            if value is not None:
+                namespace[name] = value
+                lines += [f'    if {condition}:', '        return False']
+
+        lines.append('    return True')
+        exec(compile('\n'.join(lines), '<archive_predicate>', 'exec'),
+             namespace)
+        return namespace['predicate']
+
 
 def setup_logging(log_config):
     """配置应用日志系统"""
     logger = logging.getLogger("FileArchiver")
+    logger.propagate = False
     logger.setLevel(
         logging.DEBUG if log_config.get('verbose') else logging.INFO)
 
@@ -175,88 +306,105 @@ def setup_logging(log_config):
     return logger
 
 
+_SIZE_RE = re.compile(r'^\s*(\d+)\s*([KMGT]?B?)\s*$', re.IGNORECASE)
+_SIZE_MULTIPLIERS = {
+    '': 1,
+    'B': 1,
+    'K': 1024,
+    'KB': 1024,
+    'M': 1024**2,
+    'MB': 1024**2,
+    'G': 1024**3,
+    'GB': 1024**3,
+    'T': 1024**4,
+    'TB': 1024**4
+}
+
+
 def parse_size(size_str):
     """解析人类可读的文件大小"""
     if not size_str:
         return 0
 
-    size_str = size_str.upper().strip()
-    if size_str.endswith('KB'):
-        return int(size_str[:-2]) * 1024
-    elif size_str.endswith('MB'):
-        return int(size_str[:-2]) * 1024 * 1024
-    elif size_str.endswith('GB'):
-        return int(size_str[:-2]) * 1024 * 1024 * 1024
-    return int(size_str)
+    match = _SIZE_RE.match(size_str)
+    if not match:
+        raise ValueError(f"无效的文件大小: {size_str}")
+    return int(match.group(1)) * _SIZE_MULTIPLIERS[match.group(2).upper()]
 
 
-def should_archive(filepath, filters, audit_logger):
-    """判断文件是否符合归档条件"""
+def should_archive(entry, config, audit_logger):
+    """判断文件是否符合归档条件（entry 为 os.scandir 返回的 DirEntry）"""
     check_start = time.time()
+    filepath = entry.path
+    filename = entry.name
+    filters = config.filters
     try:
-        stat = os.stat(filepath)
-        filename = os.path.basename(filepath)
+        # 未开启跳过审计时直接使用预生成的判定函数，
+        # 否则逐项检查以记录每个跳过原因
+        if not config.audit_skips:
+            return config.predicate(entry)
 
+        # 先执行仅依赖文件名的廉价检查
         # 扩展名筛选
         if 'extensions' in filters:
-            file_ext = os.path.splitext(filepath)[1].lower()
-            allowed_ext = [ext.lower() for ext in filters['extensions']]
-            if not file_ext or file_ext not in allowed_ext:
+            dot = filename.rfind('.')
+            file_ext = ''
+            if dot > 0 and filename[:dot].lstrip('.'):
+                file_ext = filename[dot:].lower()
+            if not file_ext or file_ext not in config.ext_set:
                 audit_logger.log("FILTER_CHECK", filepath, "SKIPPED",
                                  check_start, f"扩展名 {file_ext} 不在允许列表中")
                 return False
 
+        # 排除模式
+        if config.exclude_re is not None:
+            match = config.exclude_re.search(filename)
+            if match:
+                audit_logger.log("FILTER_CHECK", filepath, "SKIPPED",
+                                 check_start, f"匹配排除模式 {match.group(0)}")
+                return False
+
+        # 正则匹配
+        if config.regex_re is not None:
+            if not config.regex_re.search(filename):
+                audit_logger.log("FILTER_CHECK", filepath, "SKIPPED",
+                                 check_start, f"不匹配正则表达式 {filters['regex']}")
+                return False
+
+        # 仅在存在大小/时间条件时才调用 stat
+        if not config.needs_stat:
+            return True
+        stat = entry.stat()
+
         # 大小筛选
-        if 'size_limit' in filters:
-            if stat.st_size > parse_size(filters['size_limit']):
+        if config.size_limit_bytes is not None:
+            if stat.st_size > config.size_limit_bytes:
                 audit_logger.log("FILTER_CHECK", filepath, "SKIPPED",
                                  check_start,
                                  f"超过最大限制 {filters['size_limit']}")
                 return False
 
-        if 'min_size' in filters:
-            if stat.st_size < parse_size(filters['min_size']):
+        if config.min_size_bytes is not None:
+            if stat.st_size < config.min_size_bytes:
                 audit_logger.log("FILTER_CHECK", filepath, "SKIPPED",
                                  check_start, f"小于最小限制 {filters['min_size']}")
                 return False
 
         # 时间筛选
-        mod_time = datetime.fromtimestamp(stat.st_mtime)
-        create_time = datetime.fromtimestamp(stat.st_ctime)
-
-        if 'modified_days' in filters:
-            cutoff = datetime.now() - timedelta(
-                days=int(filters['modified_days']))
-            if mod_time > cutoff:
+        if config.mtime_cutoff is not None:
+            if stat.st_mtime > config.mtime_cutoff:
                 audit_logger.log("FILTER_CHECK", filepath, "SKIPPED",
                                  check_start,
                                  f"在最近 {filters['modified_days']} 天内修改过")
                 return False
 
-        if 'created_days' in filters:
-            cutoff = datetime.now() - timedelta(
-                days=int(filters['created_days']))
-            if create_time > cutoff:
+        if config.ctime_cutoff is not None:
+            if stat.st_ctime > config.ctime_cutoff:
                 audit_logger.log("FILTER_CHECK", filepath, "SKIPPED",
                                  check_start,
                                  f"在最近 {filters['created_days']} 天内创建")
                 return False
 
-        # 正则匹配
-        if 'regex' in filters:
-            if not re.search(filters['regex'], filename):
-                audit_logger.log("FILTER_CHECK", filepath, "SKIPPED",
-                                 check_start, f"不匹配正则表达式 {filters['regex']}")
-                return False
-
-        # 排除模式
-        if 'exclude' in filters:
-            for pattern in filters['exclude']:
-                if pattern in filename:
-                    audit_logger.log("FILTER_CHECK", filepath, "SKIPPED",
-                                     check_start, f"匹配排除模式 {pattern}")
-                    return False
-
         return True
 
     except Exception as e:
@@ -265,8 +413,244 @@ def should_archive(filepath, filters, audit_logger):
         return False
 
 
-def archive_folder(source_path, config, logger, audit_logger):
-    """处理单个文件夹归档"""
+def move_file(src, dst):
+    """移动文件：同一文件系统内直接 rename，跨文件系统时回退到 shutil.move"""
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
+
+
+def process_file(entry,
+                 archive_path,
+                 archive_prefix,
+                 config,
+                 logger,
+                 audit_logger,
+                 prefiltered=False):
+    """处理单个文件，返回 processed/skipped/failed 之一
+
+    archive_prefix 为 archive_path 加路径分隔符，用于直接拼接目标路径；
+    prefiltered 为 True 表示文件已通过筛选，不再重复检查
+    """
+    filename = entry.name
+    filepath = entry.path
+    file_start = time.time()
+    try:
+        if config.args.dry_run:
+            logger.info(f"[模拟] 将归档: {filename}")
+            return 'processed'
+        if not prefiltered and not should_archive(entry, config,
+                                                  audit_logger):
+            return 'skipped'
+        move_file(filepath, archive_prefix + filename)
+        logger.debug(f"已归档: {filename}")
+        audit_logger.log("FILE_MOVE", filepath, "SUCCESS", file_start,
+                         f"成功归档到 {archive_path}")
+        return 'processed'
+    except Exception as e:
+        logger.error(f"处理文件失败 {filename}: {str(e)}")
+        audit_logger.log("FILE_MOVE", filepath, "FAILED", file_start,
+                         f"归档失败: {str(e)}")
+        return 'failed'
+
+
+# io_uring 未执行（或中途出错后状态未知）的重命名，需由调用方逐个移动
+_NOT_MOVED = object()
+# 出错后等待已提交请求完成的最长时间（秒）
+IO_URING_DRAIN_TIMEOUT = 5
+
+
+def _reap_rename(ring, cqe, results, first, count, wait):
+    """取出一个完成事件，将结果写入 results 中 [first, first+count) 范围"""
+    wait(ring, cqe)
+    completion = cqe[0]
+    index = completion.user_data
+    try:
+        completion.res
+        error = None
+    except OSError as e:
+        error = e
+    liburing.io_uring_cqe_seen(ring, completion)
+    if first <= index < first + count:
+        results[index] = error
+
+
+def _drain_renames(ring, cqe, results, first, queued, reaped):
+    """出错后提交剩余请求并等待已提交的请求完成，保留其结果"""
+    timeout = liburing.timespec(IO_URING_DRAIN_TIMEOUT)
+
+    def wait(ring, cqe):
+        liburing.io_uring_wait_cqe_timeout(ring, cqe, timeout)
+
+    try:
+        liburing.io_uring_submit(ring)
+        while reaped < queued:
+            try:
+                _reap_rename(ring, cqe, results, first, queued, wait)
+            except InterruptedError:
+                continue
+            reaped += 1
+    except OSError:
+        # 超时或无法继续等待时，剩余结果交由调用方按文件状态判断
+        pass
+
+
+def _batch_rename_io_uring(source_path, archive_path, names):
+    """通过 io_uring 批量执行 renameat
+
+    返回与 names 对应的结果列表：None 表示成功，异常表示失败，
+    _NOT_MOVED 表示中途出错后未执行或状态未知
+    """
+    ring = liburing.Ring()
+    cqe = liburing.Cqe()
+    liburing.io_uring_queue_init(IO_URING_BATCH_SIZE, ring)
+    src_fd = dst_fd = None
+    try:
+        # 5.11 之前的内核支持 io_uring 但不支持 RENAMEAT，需先探测；
+        # 5.6 之前的内核无法注册 probe，返回 None，同样视为不支持
+        probe = liburing.io_uring_get_probe_ring(ring)
+        supported = False
+        if probe is not None:
+            try:
+                supported = liburing.io_uring_opcode_supported(
+                    probe, liburing.io_uring_op.IORING_OP_RENAMEAT)
+            finally:
+                liburing.io_uring_free_probe(probe)
+        if not supported:
+            raise OSError(errno.EOPNOTSUPP, "io_uring 不支持 RENAMEAT")
+
+        # 目录只打开一次，所有请求均相对于目录描述符解析
+        src_fd = os.open(source_path, os.O_PATH | os.O_DIRECTORY)
+        dst_fd = os.open(archive_path, os.O_PATH | os.O_DIRECTORY)
+
+        results = [_NOT_MOVED] * len(names)
+        for start in range(0, len(names), IO_URING_BATCH_SIZE):
+            chunk = names[start:start + IO_URING_BATCH_SIZE]
+            queued = reaped = 0
+            try:
+                for offset, name in enumerate(chunk):
+                    sqe = liburing.io_uring_get_sqe(ring)
+                    queued += 1
+                    liburing.io_uring_prep_rename(sqe,
+                                                  name,
+                                                  name,
+                                                  olddfd=src_fd,
+                                                  newdfd=dst_fd)
+                    liburing.io_uring_sqe_set_data64(sqe, start + offset)
+                liburing.io_uring_submit_and_wait(ring, queued)
+                while reaped < queued:
+                    _reap_rename(ring, cqe, results, start, queued,
+                                 liburing.io_uring_wait_cqe)
+                    reaped += 1
+            except Exception:
+                # 中途出错：收回本批已提交请求的结果，其余交由调用方处理
+                _drain_renames(ring, cqe, results, start, queued, reaped)
+                return results
+        return results
+    finally:
+        for fd in (src_fd, dst_fd):
+            if fd is not None:
+                os.close(fd)
+        liburing.io_uring_queue_exit(ring)
+
+
+# io_uring 重命名失败后需逐个重试的错误码
+_RETRY_ERRNOS = frozenset((errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP))
+
+
+def batch_move(source_path, archive_path, names):
+    """批量移动文件，返回与 names 对应的异常列表（成功为 None）"""
+    results = [_NOT_MOVED] * len(names)
+    if liburing is not None:
+        try:
+            results = _batch_rename_io_uring(source_path, archive_path, names)
+        except OSError:
+            # 内核不支持 io_uring、RENAMEAT 或被禁用时回退到逐个移动
+            pass
+
+    source_prefix = os.path.join(source_path, '')
+    archive_prefix = os.path.join(archive_path, '')
+    errors = [None] * len(names)
+    for i, result in enumerate(results):
+        src = source_prefix + names[i]
+        dst = archive_prefix + names[i]
+        if result is _NOT_MOVED:
+            # 状态未知时若文件已在归档目录中，说明 io_uring 已完成移动
+            if not os.path.lexists(src) and os.path.lexists(dst):
+                continue
+        elif not (isinstance(result, OSError) and
+                  result.errno in _RETRY_ERRNOS):
+            errors[i] = result
+            continue
+
+        # 未执行、跨文件系统或内核拒绝该操作时，改用 move_file 逐个处理
+        try:
+            move_file(src, dst)
+        except Exception as e:
+            errors[i] = e
+    return errors
+
+
+def archive_entries_batched(source_path,
+                            archive_path,
+                            entries,
+                            config,
+                            logger,
+                            audit_logger,
+                            file_executor,
+                            prefiltered=False):
+    """先筛选全部文件，再批量移动，返回统计结果"""
+    results = {'processed': 0, 'skipped': 0, 'failed': 0}
+    if prefiltered:
+        matched = [True] * len(entries)
+    elif len(entries) > PARALLEL_THRESHOLD:
+        matched = list(
+            file_executor.map(
+                lambda entry: should_archive(entry, config, audit_logger),
+                entries))
+    else:
+        matched = [
+            should_archive(entry, config, audit_logger) for entry in entries
+        ]
+
+    selected = [entry for entry, ok in zip(entries, matched) if ok]
+    results['skipped'] = len(entries) - len(selected)
+
+    # 批量移动无法得到单个文件的耗时，审计记录中耗时记为 0
+    errors = batch_move(source_path, archive_path,
+                        [entry.name for entry in selected])
+    for entry, error in zip(selected, errors):
+        if error is None:
+            results['processed'] += 1
+            logger.debug(f"已归档: {entry.name}")
+            audit_logger.log("FILE_MOVE", entry.path, "SUCCESS", None,
+                             f"成功归档到 {archive_path}")
+        else:
+            results['failed'] += 1
+            logger.error(f"处理文件失败 {entry.name}: {str(error)}")
+            audit_logger.log("FILE_MOVE", entry.path, "FAILED", None,
+                             f"归档失败: {str(error)}")
+    return results
+
+
+def _archive_dir_name():
+    """生成归档子目录名，附加进程号与计数器保证并发时唯一"""
+    return (time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime()) +
+            f"_{os.getpid()}_{next(_archive_counter)}")
+
+
+def archive_folder(source_path,
+                   config,
+                   logger,
+                   audit_logger,
+                   file_executor=None):
+    """处理单个文件夹归档
+
+    file_executor 为多个文件夹共享的文件处理线程池；未提供时按需创建
+    """
     folder_start = time.time()
     audit_logger.log("FOLDER_START", source_path, "STARTED", folder_start,
                      "开始处理文件夹")
@@ -275,11 +659,11 @@ def archive_folder(source_path, config, logger, audit_logger):
         logger.error(f"文件夹不存在: {source_path}")
         audit_logger.log("FOLDER_ERROR", source_path, "FAILED", folder_start,
                          "文件夹不存在")
+        audit_logger.flush()
         return False
 
     # 创建归档子目录
-    archive_path = os.path.join(source_path,
-                                datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+    archive_path = os.path.join(source_path, _archive_dir_name())
     try:
         os.makedirs(archive_path, exist_ok=True)
         audit_logger.log("FOLDER_CREATE", archive_path, "SUCCESS",
@@ -288,41 +672,67 @@ def archive_folder(source_path, config, logger, audit_logger):
         logger.error(f"创建归档目录失败: {str(e)}")
         audit_logger.log("FOLDER_CREATE", archive_path, "FAILED", folder_start,
                          f"创建失败: {str(e)}")
+        audit_logger.flush()
         return False
 
     # 处理文件
-    processed = 0
-    skipped = 0
-    failed = 0
-
-    for filename in os.listdir(source_path):
-        filepath = os.path.join(source_path, filename)
-
-        if os.path.isfile(filepath):
-            file_start = time.time()
-            try:
-                if config.args.dry_run:
-                    logger.info(f"[模拟] 将归档: {filename}")
-                    processed += 1
-                elif should_archive(filepath, config.filters, audit_logger):
-                    shutil.move(filepath, os.path.join(archive_path, filename))
-                    processed += 1
-                    logger.debug(f"已归档: {filename}")
-                    audit_logger.log("FILE_MOVE", filepath, "SUCCESS",
-                                     file_start, f"成功归档到 {archive_path}")
-                else:
-                    skipped += 1
-            except Exception as e:
-                failed += 1
-                logger.error(f"处理文件失败 {filename}: {str(e)}")
-                audit_logger.log("FILE_MOVE", filepath, "FAILED", file_start,
-                                 f"归档失败: {str(e)}")
+    with os.scandir(source_path) as it:
+        entries = [
+            entry for entry in it if entry.is_file(follow_symlinks=False)
+        ]
+
+    # 只有文件名条件时，用内置 filter() 一次性筛掉不匹配的文件，
+    # 避免为每个被排除的文件创建任务和调用 should_archive
+    prefiltered = not (config.needs_stat or config.audit_skips or
+                       config.args.dry_run)
+    prefiltered_skips = 0
+    if prefiltered:
+        matched = list(filter(config.predicate, entries))
+        prefiltered_skips = len(entries) - len(matched)
+        entries = matched
+
+    # 目标路径前缀只计算一次，逐文件直接拼接
+    archive_prefix = os.path.join(archive_path, '')
+    results = {'processed': 0, 'skipped': 0, 'failed': 0}
+    own_executor = None
+    if file_executor is None and len(entries) > PARALLEL_THRESHOLD:
+        file_executor = own_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_FILE_WORKERS)
+    try:
+        if liburing is not None and not config.args.dry_run:
+            results = archive_entries_batched(source_path, archive_path,
+                                              entries, config, logger,
+                                              audit_logger, file_executor,
+                                              prefiltered)
+        elif len(entries) > PARALLEL_THRESHOLD:
+            # 文件较多时并行处理，重叠 stat/move 系统调用的等待时间
+            futures = [
+                file_executor.submit(process_file, entry, archive_path,
+                                     archive_prefix, config, logger,
+                                     audit_logger, prefiltered)
+                for entry in entries
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                results[future.result()] += 1
+        else:
+            for entry in entries:
+                results[process_file(entry, archive_path, archive_prefix,
+                                     config, logger, audit_logger,
+                                     prefiltered)] += 1
+    finally:
+        if own_executor is not None:
+            own_executor.shutdown()
+
+    processed = results['processed']
+    skipped = results['skipped'] + prefiltered_skips
+    failed = results['failed']
 
     # 记录完成状态
     logger.info(
         f"完成 {source_path}: 已归档 {processed}, 跳过 {skipped}, 失败 {failed}")
     audit_logger.log("FOLDER_COMPLETE", source_path, "COMPLETED", folder_start,
                      f"处理结果: {processed} 已归档, {skipped} 跳过, {failed} 失败")
+    audit_logger.flush()
 
     return processed > 0 or failed == 0
 
@@ -354,6 +764,9 @@ def parse_arguments():
     parser.add_argument('--strict', action='store_true', help='遇到错误立即停止')
     parser.add_argument('--dry-run', action='store_true', help='模拟运行不实际移动文件')
     parser.add_argument('--verbose', action='store_true', help='显示详细调试信息')
+    parser.add_argument('--audit-skips',
+                        action='store_true',
+                        help='记录被筛选跳过文件的审计日志')
 
     return parser.parse_args()
 
@@ -369,27 +782,50 @@ def main():
 
     # 获取待处理文件夹列表
     folders_to_process = []
-    if not args.no_config and config.settings and 'folders' in config.settings:
-        folders_to_process.extend(
-            [f['path'] for f in config.settings['folders'] if 'path' in f])
+    if not args.no_config:
+        folders_to_process.extend(config.iter_folder_paths())
     folders_to_process.extend(args.folders)
 
+    # 同一目录（含不同写法或符号链接）只处理一次，避免并发重复移动
+    seen = set()
+    unique_folders = []
+    for folder in folders_to_process:
+        real = os.path.realpath(folder)
+        if real not in seen:
+            seen.add(real)
+            unique_folders.append(folder)
+    folders_to_process = unique_folders
+
     if not folders_to_process:
         logger.error("错误：未指定要处理的文件夹")
         return 1
 
-    # 处理文件夹
+    # 并行处理文件夹；所有文件夹共享一个文件线程池，限制总线程数
     success_count = 0
-    for folder in folders_to_process:
-        try:
-            if archive_folder(folder, config, logger, audit_logger):
-                success_count += 1
-            elif args.strict:
-                raise RuntimeError(f"严格模式：终止于失败文件夹 {folder}")
-        except Exception as e:
-            logger.error(f"处理文件夹 {folder} 失败: {str(e)}")
-            if args.strict:
-                return 1
+    max_workers = min(len(folders_to_process), os.cpu_count() or 4)
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_FILE_WORKERS
+    ) as file_executor, concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(archive_folder, folder, config, logger,
+                            audit_logger, file_executor): folder
+            for folder in folders_to_process
+        }
+        for future in concurrent.futures.as_completed(futures):
+            folder = futures[future]
+            try:
+                if future.result():
+                    success_count += 1
+                elif args.strict:
+                    raise RuntimeError(f"严格模式：终止于失败文件夹 {folder}")
+            except Exception as e:
+                logger.error(f"处理文件夹 {folder} 失败: {str(e)}")
+                if args.strict:
+                    # 取消尚未开始的文件夹任务
+                    for pending in futures:
+                        pending.cancel()
+                    return 1
 
     logger.info(f"归档完成：成功处理 {success_count}/{len(folders_to_process)} 个文件夹")
     return 0 if success_count == len(folders_to_process) else 1